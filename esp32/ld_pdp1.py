@@ -17,11 +17,13 @@
 #   import ld_pdp1
 #   ld_pdp1.load("/sd/pdp1/snowflake.rim")
 
-from machine import SPI, Pin, WDT, reset
+from machine import SPI, Pin, WDT, reset, idle
 from micropython import const, alloc_emergency_exception_buf
+import micropython
 import time
 import os
 import gc
+from array import array
 
 # =============================================================================
 # RETRY + WATCHDOG CONFIGURATION - Added 2026-02-14 by Jelena
@@ -35,6 +37,10 @@ MAX_UPLOAD_RETRIES = const(2)     # 2 pokušaja
 RETRY_DELAY_MS = const(500)       # 500ms pauza između pokušaja
 WDT_TIMEOUT_MS = const(30000)     # 30 sekundi watchdog timeout
 
+# Trace prints on the OSD button path (poll_events, file browser).
+# const(0): the compiler drops the "if _DEBUG:" blocks entirely.
+_DEBUG = const(0)
+
 # CRITICAL: Allocate emergency exception buffer for ISR safety
 # This MUST be called before any SPI operations on ESP32
 alloc_emergency_exception_buf(100)
@@ -51,7 +57,14 @@ gpio_mosi = const(4)
 spi_channel = const(2)  # VSPI on ESP32
 # FIXED 2026-02-13: Changed from 3MHz to 1MHz for better timing margin
 # 3MHz caused SPI commands to fail on ULX3S v3.1.7 with ESP32 OSD bitstream
-spi_freq = const(1000000)  # 1 MHz - verified working
+spi_freq = const(1000000)  # 1 MHz - verified working, the default
+# Faster clock, explicit opt-in only: start_osd(fast_spi=True).
+# esp32_spi_slave.v is rated 10 MHz, but esp32_osd.v has no echo to
+# verify a clock with (MISO is the button latch, 0x00 at idle, whether or
+# not a command was decoded), and 3 MHz once failed on v3.1.7 (above).
+spi_freq_fast = const(4000000)
+# Clock in use for commands, OSD and file data: spi_freq unless opted in
+spi_freq_cmd = spi_freq
 
 # SPI Commands (MiSTer compatible via esp32_osd.v)
 CMD_FILE_TX_EN   = const(0x53)
@@ -100,52 +113,271 @@ BTN_RIGHT = const(0x40)  # btn[6]
 # =============================================================================
 OSD_CURSOR_COMBO = const(0x78)  # Cursor combo: UP+DOWN+LEFT+RIGHT
 
+# OSD geometry (esp32_osd.v): 16 lines x 32 chars, each line write is
+# one command byte + 32 chars
+OSD_LINES    = const(16)
+OSD_COLS     = const(32)
+OSD_LINE_LEN = const(33)
+
+# Static OSD lines - already encoded and padded to 32 chars, copied into
+# the OSD frame as-is (no str padding / encode() per redraw)
+OSD_LINE_BLANK = b" " * OSD_COLS
+OSD_DIR_FOOTER = b"U/D:Nav L:Bk R:Sel FIRE1:Rfsh   "
+# Blank OSD frame: 16 x (CMD_OSD_WRITE + line, 32 spaces)
+OSD_FRAME_BLANK = b"".join(bytes([CMD_OSD_WRITE + i]) + OSD_LINE_BLANK
+                           for i in range(OSD_LINES))
+
+# File browser filter - all 4 chars, matched as fname[-4:] in DIR_EXTS
+# (MicroPython str.endswith() does not take a tuple)
+DIR_EXTS = ('.rim', '.bin', '.bit', '.hex')
+
 # File type index for RIM files
 FILE_INDEX_RIM = const(1)
 FILE_INDEX_HEX = const(2)
 
-def init_spi():
+# Transfer chunk sizes
+LOAD_BUF_SIZE  = const(16384)  # load(): 32 SD sectors, 4 DMA blocks
+
+# ld_pdp1 command buffers - allocated once at import and mutated in place
+# (like spi_read_irq/spi_read_btn for the OSD), so no SPI command
+# allocates a fresh bytearray
+spi_cmd_status  = bytearray([CMD_STATUS, 0, 0, 0, 0])
+spi_cmd_tx_en   = bytearray([CMD_FILE_TX_EN, 0])
+spi_cmd_index   = bytearray([CMD_FILE_INDEX, 0])
+spi_cmd_tx_data = bytes([CMD_FILE_TX_DATA])
+# OSD on/off (MiSTer single-byte commands) - immutable, never reallocated
+spi_cmd_osd_on  = bytes([CMD_OSD_ENABLE])
+spi_cmd_osd_off = bytes([CMD_OSD_DISABLE])
+# CPU control sequences: two status frames under one CS. top_pdp1_esp32.v
+# syncs the status bits into clk_cpu (meta -> sync -> prev) and detects
+# edges as sync & ~prev, so the first value must stay stable for at least
+# 3 clk_cpu cycles (~60 ns at 51 MHz) before the second arrives. The frames
+# are 40 SCK cycles apart - 4 us even at the slave's 10 MHz maximum - so
+# the FPGA sees both values (and the edge between them) at any spi clock.
+spi_cmd_run        = bytes([CMD_STATUS, 0, 0, 0, 0,   # clear all bits
+                            CMD_STATUS, 1, 0, 0, 0])  # RUN rising edge
+spi_cmd_halt_reset = bytes([CMD_STATUS, 2, 0, 0, 0,   # halt
+                            CMD_STATUS, 6, 0, 0, 0])  # halt + RESET edge
+# Settle time between end of a file transfer and cpu_run().
+# gpio_irq only reports button changes (esp32_osd.v irq_pending), so there
+# is no "load done" line to wait on. The RIM FSM decodes each word within
+# ~120 clk_cpu cycles (~2.4 us) and load() returns only after the transfer
+# disable frame has been clocked out, so 1 ms is ample.
+LOAD_SETTLE_MS = const(1)
+# Transfer prelude for begin_transfer(): file index, transfer enable,
+# data command ([1] = file index, set per transfer)
+spi_cmd_prelude = bytearray([CMD_FILE_INDEX, FILE_INDEX_RIM,
+                             CMD_FILE_TX_EN, 1,
+                             CMD_FILE_TX_DATA])
+
+# Transfer buffers - allocated once at import, while the heap is still
+# unfragmented, and shared by every ld_pdp1 instance. Without SPIRAM the
+# MicroPython heap is internal DRAM, so the IDF driver can DMA straight
+# from these (word aligned) instead of going through a bounce buffer.
+# Allocating them per load() could fail to find 16 KB contiguous later.
+spi_load_buf = bytearray(LOAD_BUF_SIZE)   # load(): file data
+spi_load_mv = memoryview(spi_load_buf)
+
+# Let the GC run on its own once another quarter of the free heap has
+# been allocated, instead of only when an allocation fails - short,
+# regular collections rather than one long stall in the middle of a
+# load. Explicit gc.collect() calls remain only where a large block is
+# about to be needed (SD mount, directory scan, OSD buffers) or has just
+# been dropped (file data after a load in load()/load_file()).
+gc.collect()
+gc.threshold(gc.mem_free() // 4 + gc.mem_alloc())
+
+def _read_file(f, size):
+    """Read all of open file f (size bytes) for load_from_bytes()
+
+    Files up to LOAD_BUF_SIZE (all RIM tapes in practice) are read with
+    readinto() into spi_load_buf and returned as a memoryview, so no
+    file-sized bytes object is allocated. Only larger files fall back
+    to f.read(). The view is valid until the next load.
+    """
+    if size <= LOAD_BUF_SIZE:
+        return spi_load_mv[:f.readinto(spi_load_buf)]
+    return f.read()
+
+def init_spi(baudrate=None):
     """Initialize SPI and CS pin with correct settings
 
     FIXED 2026-02-14: Sprema globalnu referencu za kasniji deinit.
+
+    Idempotent: while the bus is up (_spi_instance set) the existing
+    spi/cs are returned, only re-clocked if baudrate is given. The IDF
+    spi_device is rebuilt only after release_sd_pins() or an SD switch
+    has deinitialized SPI (they clear _spi_instance).
+
+    Args:
+        baudrate: SPI clock in Hz (default spi_freq_cmd - spi_freq unless
+                  start_osd(fast_spi=True) opted in to spi_freq_fast)
+
+    NOTE: Single lane (SIO) only. esp32_spi_slave.v shifts one MOSI bit
+    per SCK and the ULX3S wifi_gpio wiring has no extra data lanes, so
+    quad (QIO) mode is not an option - faster loads go via baudrate
+    (spi_freq_cmd, spi_freq_fast only when opted in).
     """
-    global spi, cs, _spi_instance
-    spi = SPI(spi_channel, baudrate=spi_freq, polarity=0, phase=0,
+    global spi, cs, _spi_instance, _sd_released
+    if _spi_instance is not None:
+        if baudrate is not None:
+            _spi_instance.init(baudrate=baudrate)
+        return _spi_instance, cs
+    if baudrate is None:
+        baudrate = spi_freq_cmd
+    spi = SPI(spi_channel, baudrate=baudrate, polarity=0, phase=0,
               bits=8, firstbit=SPI.MSB,
               sck=Pin(gpio_sck), mosi=Pin(gpio_mosi), miso=Pin(gpio_miso))
     cs = Pin(gpio_cs, Pin.OUT)
     cs.on()  # CS inactive = HIGH = on()  (FIXED 2026-02-13)
     _spi_instance = spi  # Save global reference for deinit
+    _sd_released = False  # SPI owns MOSI/MISO/SCK now
     return spi, cs
 
 
+@micropython.native
+def _stream_file(readinto, spi_write, buf, mv):
+    """Copy a file to SPI through buf until EOF, return bytes sent
+
+    Inner loop of ld_pdp1.load(), compiled to native code. Takes the
+    bound f.readinto / spi.write so the loop does no attribute lookups.
+    CS and the file data command are handled by the caller.
+
+    NOTE: No C module for this - each pass moves LOAD_BUF_SIZE bytes
+    (~33 ms on the wire at 4 MHz), so the ~50 us of binding and
+    driver setup per spi.write() is well under 1% of the transfer.
+
+    No progress output here: this runs with CS held low, and a blocking
+    UART print would stall the stream. Callers report after CS is released.
+
+    NOTE: Single buffer on purpose. machine.SPI.write() blocks until the
+    last queued DMA block is done, so a second buffer could not be filled
+    while the first is on the wire. And SD files cannot be read during
+    the stream at all (MOSI/MISO shared with the SD card, see load_file()).
+    """
+    size = len(buf)
+    total = 0
+    while True:
+        n = readinto(buf)
+        if not n:
+            return total
+        spi_write(mv[:n] if n < size else buf)
+        total += n
+
+
+# RIM opcodes used by hex_to_rim()
+DIO_OPCODE = const(26)  # octal 32 - deposit into memory
+JMP_OPCODE = const(48)  # octal 60 - jump to address
+
+def hex_to_rim(hex_lines, start_addr=0o100, skip_blank=False):
+    """Convert HEX memory image lines to synthetic RIM data
+
+    Shared by ld_pdp1.load_hex() and OsdController.load_file().
+
+    Default: HEX line N goes to address N - blank, '#' and unparsable lines
+    still take up their address (one line per address layout). With
+    skip_blank=True they are dropped without consuming an address (the
+    OSD load_file() rule). Zero words are skipped - original RIM only sends
+    non-zero words, this reduces 24KB -> ~2.5KB for snowflake. A JMP to
+    start_addr ends the tape.
+
+    RIM format: 6 bytes per word
+      Byte 0: 0x80 | opcode (DIO=0o32=26 for data, JMP=0o60=48 for jump)
+      Byte 1: 0x80 | (addr >> 6)
+      Byte 2: 0x80 | (addr & 0x3F)
+      Byte 3: 0x80 | (data >> 12)
+      Byte 4: 0x80 | ((data >> 6) & 0x3F)
+      Byte 5: 0x80 | (data & 0x3F)
+
+    Returns:
+        (rim_data, word_count)
+    """
+    rim_data = bytearray()
+    addr = 0
+    word_count = 0
+
+    for line in hex_lines:
+        line = line.strip()
+        if not line or line.startswith('#'):
+            if not skip_blank:
+                addr = (addr + 1) & 0xFFF
+            continue
+        try:
+            data = int(line, 16) & 0x3FFFF  # 18-bit mask
+        except ValueError:
+            if not skip_blank:
+                addr = (addr + 1) & 0xFFF
+            continue
+        if data == 0:
+            addr = (addr + 1) & 0xFFF
+            continue
+        rim_data.extend(bytes([
+            0x80 | DIO_OPCODE,
+            0x80 | ((addr >> 6) & 0x3F),
+            0x80 | (addr & 0x3F),
+            0x80 | ((data >> 12) & 0x3F),
+            0x80 | ((data >> 6) & 0x3F),
+            0x80 | (data & 0x3F)
+        ]))
+        addr = (addr + 1) & 0xFFF
+        word_count += 1
+
+    # Add JMP to entry point
+    rim_data.extend(bytes([
+        0x80 | JMP_OPCODE,
+        0x80 | ((start_addr >> 6) & 0x3F),
+        0x80 | (start_addr & 0x3F),
+        0x80, 0x80, 0x80  # Data field (ignored for JMP)
+    ]))
+    return rim_data, word_count
+
+
 class ld_pdp1:
     def __init__(self, spi=None, cs=None):
         if spi is None or cs is None:
-            self.spi, self.cs = init_spi()
-        else:
-            self.spi = spi
-            self.cs = cs
+            spi, cs = init_spi()
+        self._set_spi(spi, cs)
         # Ensure CS starts inactive (HIGH)
         self.cs.on()  # HIGH = inactive (FIXED 2026-02-13)
 
+    def _set_spi(self, spi, cs):
+        """Attach SPI bus and CS pin, caching their bound methods
+
+        Saves an attribute lookup + bound-method allocation on every
+        CS toggle and spi.write() call.
+
+        CS stays on the bound zero-argument on()/off(): cs.value(0/1) has to
+        parse an argument, and a raw GPIO_OUT_W1TS/W1TC register store costs
+        the same subscript dispatch while bypassing the Pin driver state.
+        """
+        self.spi = spi
+        self.cs = cs
+        self._cs_on = cs.on
+        self._cs_off = cs.off
+        self._spi_write = spi.write
+
     def _cs_active(self):
         """CS active (active low) = LOW = off()
 
         FIXED 2026-02-13: Pin.on() gives HIGH, Pin.off() gives LOW
         CS is active-low, so we need LOW for active = off()
         """
-        self.cs.off()  # LOW = active
+        self._cs_off()  # LOW = active
 
     def _cs_inactive(self):
         """CS inactive (high) = HIGH = on()"""
-        self.cs.on()  # HIGH = inactive
+        self._cs_on()  # HIGH = inactive
+
+    # Hot paths below call the cached self._cs_off() / self._cs_on()
+    # directly (active = LOW = off) - one bound C call instead of a
+    # Python method call wrapping it.
 
     def ctrl(self, i):
         """Send control byte via status command"""
-        self._cs_active()
-        self.spi.write(bytearray([CMD_STATUS, i & 0xFF, 0, 0, 0]))
-        self._cs_inactive()
+        spi_cmd_status[1] = i & 0xFF
+        self._cs_off()
+        self._spi_write(spi_cmd_status)
+        self._cs_on()
 
     def cpu_halt(self):
         """Halt CPU (status bit 1)"""
@@ -161,36 +393,79 @@ class ld_pdp1:
 
         New sequence:
         1. ctrl(0) - Clear ALL bits (including RUN and HALT)
-        2. Delay for CDC propagation (2 clk_cpu cycles @ 51MHz = ~40ns, but
-           we add 10ms for safety due to SPI latency)
+        2. Delay for CDC propagation (2 clk_cpu cycles @ 51MHz = ~40ns)
         3. ctrl(1) - Set RUN bit - creates rising edge 0->1
+
+        Both frames go out in one CS (spi_cmd_run); the second frame
+        arrives one 40-SCK frame after the first (>= 4 us at any supported
+        clock), which covers step 2.
         """
-        self.ctrl(0)   # Clear all status bits first
-        time.sleep_ms(10)
-        self.ctrl(1)   # Set RUN bit - now guaranteed rising edge
+        self._cs_off()
+        self._spi_write(spi_cmd_run)
+        self._cs_on()
 
     def cpu_reset(self):
         """Reset CPU (status bit 2 rising edge) - keep halt active!"""
         self.ctrl(6)  # bits 1+2 = 0b110 = 6 (halt + reset together)
 
+    def cpu_halt_reset(self):
+        """Halt, then reset CPU - cpu_halt() + cpu_reset() in one transaction
+
+        ctrl(2) first guarantees bit 2 is low, so ctrl(6) is a reset edge.
+        """
+        self._cs_off()
+        self._spi_write(spi_cmd_halt_reset)
+        self._cs_on()
+
     def file_tx_enable(self, en=True):
         """Enable/disable file transfer mode"""
-        self._cs_active()
-        self.spi.write(bytearray([CMD_FILE_TX_EN, 1 if en else 0]))
-        self._cs_inactive()
+        spi_cmd_tx_en[1] = 1 if en else 0
+        self._cs_off()
+        self._spi_write(spi_cmd_tx_en)
+        self._cs_on()
 
     def file_index(self, idx):
         """Set file type index"""
-        self._cs_active()
-        self.spi.write(bytearray([CMD_FILE_INDEX, idx & 0xFF]))
-        self._cs_inactive()
+        spi_cmd_index[1] = idx & 0xFF
+        self._cs_off()
+        self._spi_write(spi_cmd_index)
+        self._cs_on()
+
+    def begin_transfer(self, idx=FILE_INDEX_RIM):
+        """Start a file transfer - index, enable and data command in one CS
+
+        esp32_osd.v decodes the three commands back to back and then stays
+        in ST_FILE_DATA until CS goes high, so everything written until
+        end_transfer() is raw file data. The data phase runs at the same
+        spi_freq_cmd as the commands (spi_freq unless opted in).
+        """
+        spi_cmd_prelude[1] = idx & 0xFF
+        self._cs_off()
+        self._spi_write(spi_cmd_prelude)
+
+    def end_transfer(self, settle_ms=0):
+        """Finish a transfer started with begin_transfer()
+
+        CS goes high first - it is the only way out of ST_FILE_DATA, a
+        disable command under the same CS would be taken as file data.
+        Then it optionally waits settle_ms, and file transfer is disabled.
+        """
+        self._cs_on()
+        if settle_ms:
+            time.sleep_ms(settle_ms)
+        self.file_tx_enable(False)
 
     def file_tx_data(self, data):
-        """Send file data bytes"""
-        self._cs_active()
-        self.spi.write(bytearray([CMD_FILE_TX_DATA]))
-        self.spi.write(data)
-        self._cs_inactive()
+        """Send file data bytes - command + payload under one CS
+
+        Kept for manual use only; load() and load_from_bytes() stream
+        through begin_transfer() / end_transfer(). No staging buffer, so
+        this costs no heap when unused.
+        """
+        self._cs_off()
+        self._spi_write(spi_cmd_tx_data)
+        self._spi_write(data)
+        self._cs_on()
 
     def load(self, filename, verbose=True):
         """Load RIM paper tape file to PDP-1"""
@@ -213,42 +488,48 @@ class ld_pdp1:
             print("Error: Cannot open file: {} ({})".format(filename, e))
             return False
 
-        # Set file index for RIM type
-        self.file_index(FILE_INDEX_RIM)
-
-        # Enable file transfer
-        self.file_tx_enable(True)
-
-        # Stream file in chunks
-        CHUNK_SIZE = 256
-        total_sent = 0
-
+        # Stream file in chunks. 4092 bytes is the largest single DMA
+        # transaction of the ESP32 SPI master (max_transfer_sz default).
+        # One spi.write() gets several of them: the esp32 port splits the
+        # buffer into 4092-byte transactions and queues them back to back
+        # (spi_device_queue_trans), so there is no Python call and no
+        # driver setup gap between DMA blocks.
+        # LOAD_BUF_SIZE is a whole number of 512-byte SD sectors: FatFs
+        # then reads straight into buf (multi-sector read) instead of
+        # copying partial sectors through its window buffer. The last DMA
+        # block is just shorter (4 x 4092 + 16).
+        # Reuse one buffer for the whole file - f.read() would allocate
+        # a new bytes object per chunk
+        buf = spi_load_buf
+        mv = spi_load_mv
+
+        # Prelude and all chunks in one CS assertion (begin_transfer).
+        # Files that fit in buf (all RIM tapes in practice) are read whole
+        # before CS goes low and go out as a single write, so no SD access
+        # happens inside the transfer window.
         try:
-            while True:
-                chunk = f.read(CHUNK_SIZE)
-                if not chunk:
-                    break
-                self.file_tx_data(chunk)
-                total_sent += len(chunk)
-                if verbose and total_sent % 1024 == 0:
-                    print("  {}/{} bytes".format(total_sent, filesize))
-                    gc.collect()  # Prevent memory fragmentation
+            if filesize <= LOAD_BUF_SIZE:
+                n = f.readinto(buf)
+                self.begin_transfer(FILE_INDEX_RIM)
+                self._spi_write(mv[:n])
+                total_sent = n
+            else:
+                self.begin_transfer(FILE_INDEX_RIM)
+                total_sent = _stream_file(f.readinto, self._spi_write, buf, mv)
         except Exception as e:
+            self.end_transfer()
             print("Error during transfer: {}".format(e))
             f.close()
-            self.file_tx_enable(False)
-            gc.collect()
             return False
 
+        # Release CS, disable file transfer
+        self.end_transfer()
         f.close()
 
-        # Disable file transfer
-        self.file_tx_enable(False)
-
         if verbose:
             print("Done. Sent {} bytes.".format(total_sent))
 
-        gc.collect()
+        # No gc.collect() here - nothing was allocated (gc.threshold above)
         return True
 
     def load_hex(self, filename, start_addr=0o100, verbose=True):
@@ -286,56 +567,7 @@ class ld_pdp1:
             print("[HEX] Converting to RIM format...")
 
         # Step 2: Convert HEX to synthetic RIM format
-        # RIM format: 6 bytes per word
-        #   Byte 0: 0x80 | opcode (DIO=0o32=26 for data, JMP=0o60=48 for jump)
-        #   Byte 1: 0x80 | (addr >> 6)
-        #   Byte 2: 0x80 | (addr & 0x3F)
-        #   Byte 3: 0x80 | (data >> 12)
-        #   Byte 4: 0x80 | ((data >> 6) & 0x3F)
-        #   Byte 5: 0x80 | (data & 0x3F)
-
-        DIO_OPCODE = 26   # octal 32 - deposit into memory
-        JMP_OPCODE = 48   # octal 60 - jump to address
-
-        rim_data = bytearray()
-        addr = 0  # HEX file line N goes to address N
-        word_count = 0
-
-        for line in hex_lines:
-            line = line.strip()
-            if not line or line.startswith('#'):
-                addr += 1
-                continue
-            try:
-                data = int(line, 16) & 0x3FFFF  # 18-bit mask
-            except ValueError:
-                addr += 1
-                continue
-
-            # Skip zero values for efficiency (like original RIM files)
-            if data == 0:
-                addr += 1
-                continue
-
-            # Encode as RIM DIO instruction
-            rim_data.extend(bytes([
-                0x80 | DIO_OPCODE,
-                0x80 | ((addr >> 6) & 0x3F),
-                0x80 | (addr & 0x3F),
-                0x80 | ((data >> 12) & 0x3F),
-                0x80 | ((data >> 6) & 0x3F),
-                0x80 | (data & 0x3F)
-            ]))
-            addr += 1
-            word_count += 1
-
-        # Add JMP to entry point
-        rim_data.extend(bytes([
-            0x80 | JMP_OPCODE,
-            0x80 | ((start_addr >> 6) & 0x3F),
-            0x80 | (start_addr & 0x3F),
-            0x80, 0x80, 0x80  # Data field (ignored for JMP)
-        ]))
+        rim_data, word_count = hex_to_rim(hex_lines, start_addr)
 
         if verbose:
             print("[HEX] Converted {} words to {} bytes RIM".format(
@@ -359,74 +591,50 @@ class ld_pdp1:
         if verbose:
             print("[RIM] Step 1: Preparing transfer ({} bytes)".format(len(data)))
 
-        # Set file index for RIM type
-        self.file_index(FILE_INDEX_RIM)
-
-        # Enable file transfer
-        self.file_tx_enable(True)
-
-        # Stream data in chunks
-        CHUNK_SIZE = 256
-        total_sent = 0
-        offset = 0
-
+        # Same framing as load(): prelude, then the whole buffer in one
+        # spi.write() under the same CS. The esp32 port splits it into
+        # 4092-byte DMA transactions and queues them back to back, so
+        # slicing it here would only add Python calls.
+        if verbose:
+            print("[RIM] Step 2: Streaming data to FPGA...")
         try:
-            if verbose:
-                print("[RIM] Step 2: Streaming data to FPGA...")
-            while offset < len(data):
-                chunk = data[offset:offset + CHUNK_SIZE]
-                self.file_tx_data(chunk)
-                total_sent += len(chunk)
-                offset += CHUNK_SIZE
-                if verbose and total_sent % 1024 == 0:
-                    print("[RIM]   {}/{} bytes".format(total_sent, len(data)))
-                    gc.collect()  # Prevent memory fragmentation
+            self.begin_transfer(FILE_INDEX_RIM)
+            self._spi_write(data)
+            total_sent = len(data)
         except Exception as e:
-            print("[RIM ERROR] Transfer failed at byte {}: {}".format(total_sent, e))
-            self.file_tx_enable(False)
-            gc.collect()
+            self.end_transfer()
+            print("[RIM ERROR] Transfer failed: {}".format(e))
             return False
 
         # CRITICAL: Wait for FPGA to process last bytes before disabling transfer!
         # FPGA RIM FSM needs to decode JMP instruction and set r_rim_jmp_seen
         # before w_ioctl_download goes low, otherwise r_rim_done won't be set!
-        # 50ms should be plenty for 6 bytes @ 51 MHz (needs ~120 cycles)
+        # That takes ~120 clk_cpu cycles (~2.4 us), so LOAD_SETTLE_MS
+        # (1 ms) is ample margin - 50 ms was not needed.
         if verbose:
             print("[RIM] Step 2b: Waiting for FPGA to process last bytes...")
-        time.sleep_ms(50)
-
-        # Disable file transfer
-        self.file_tx_enable(False)
+        self.end_transfer(settle_ms=LOAD_SETTLE_MS)
 
         if verbose:
             print("[RIM] Step 3: Transfer complete - {} bytes sent".format(total_sent))
 
-        gc.collect()
         return True
 
     def load_and_run(self, filename, verbose=True):
         """Load RIM file and start execution with proper halt/reset/run sequence"""
-        # Halt CPU before loading
-        if verbose:
-            print("Halting CPU...")
-        self.cpu_halt()
-        time.sleep_ms(50)
-
-        # Reset CPU
+        # Halt and reset CPU before loading
         if verbose:
-            print("Resetting CPU...")
-        self.cpu_reset()
-        time.sleep_ms(50)
+            print("Halting + resetting CPU...")
+        self.cpu_halt_reset()
 
         # Load the file
         if self.load(filename, verbose):
-            time.sleep_ms(100)  # Wait for FPGA to process
+            time.sleep_ms(LOAD_SETTLE_MS)  # Wait for FPGA to process
 
             # Start CPU
             if verbose:
                 print("Starting CPU...")
             self.cpu_run()
-            gc.collect()
             return True
         return False
 
@@ -476,19 +684,9 @@ class ld_pdp1:
                 print("[RIM] Watchdog FED")
 
             try:
-                # Halt CPU before loading
-                print("[RIM] Halting CPU... ctrl(2) = 0b{:08b}".format(2))
-                self.cpu_halt()
-                time.sleep_ms(50)
-
-                # Feed watchdog
-                if wdt:
-                    wdt.feed()
-
-                # Reset CPU
-                print("[RIM] Resetting CPU... ctrl(4) = 0b{:08b}".format(4))
-                self.cpu_reset()
-                time.sleep_ms(50)
+                # Halt + reset CPU before loading (one transaction)
+                print("[RIM] Halting + resetting CPU... ctrl(2), ctrl(6)")
+                self.cpu_halt_reset()
 
                 # Feed watchdog
                 if wdt:
@@ -503,14 +701,13 @@ class ld_pdp1:
                     wdt.feed()
 
                 if success:
-                    time.sleep_ms(100)  # Wait for FPGA to process
+                    time.sleep_ms(LOAD_SETTLE_MS)  # Wait for FPGA to process
 
                     # Start CPU
                     print("[RIM] Starting CPU... ctrl(0) then ctrl(1)")
                     print("[RIM]   ctrl(0) = 0b{:08b} (clear all)".format(0))
                     print("[RIM]   ctrl(1) = 0b{:08b} (set RUN)".format(1))
                     self.cpu_run()
-                    gc.collect()
 
                     print("\n" + "=" * 50)
                     print("[RIM] UPLOAD SUCCESS on attempt {}!".format(attempt))
@@ -540,7 +737,6 @@ class ld_pdp1:
         print("[RIM FATAL] RESETTING ESP32 IN 2 SECONDS...")
         print("!" * 50)
 
-        gc.collect()
         time.sleep_ms(2000)  # Give user time to see message
 
         # HARD RESET ESP32
@@ -565,6 +761,28 @@ class ld_pdp1:
 
 # Global SPI reference for deinit
 _spi_instance = None
+# True while SD/SPI pins are known to be high-Z (release_sd_pins() done and
+# neither init_spi() nor an SD mount has claimed them since)
+_sd_released = False
+
+def _pins_hiz():
+    """SD pins (2, 4, 12, 13, 14, 15) + SPI pins (MOSI, MISO, SCK) to high-Z
+
+    Per Emard: create Pin as INPUT, read value, delete. Pin(i, Pin.IN)
+    moves the pad back to GPIO and resets its GPIO-matrix output select,
+    so this also releases pads still routed to the SD peripheral - just
+    clearing GPIO_ENABLE would not (their output enable comes from the
+    peripheral). Runs only around SD/SPI switches, so the 7 short-lived
+    Pin objects don't matter.
+    """
+    for i in (2, 4, 12, 13, 14, 15, gpio_sck):
+        try:
+            p = Pin(i, Pin.IN)
+            a = p.value()  # Force read to release driver
+            del p, a
+        except:
+            pass
+
 
 def release_sd_pins():
     """Put SD card pins in high-impedance mode - Emard pattern
@@ -576,8 +794,14 @@ def release_sd_pins():
     2. DELAY 100ms (hardware settle - ESP32 treba vrijeme!)
     3. Release pinovi na high-Z
     4. GC collect
+
+    Returns at once when the pins are still released from a previous
+    call (_sd_released) - no second deinit, 100 ms settle or pin pass.
     """
-    global _spi_instance
+    global _spi_instance, _sd_released
+
+    if _sd_released:
+        return
 
     # Step 1: Deinit SPI if active - KRITIČNO!
     if _spi_instance is not None:
@@ -592,26 +816,10 @@ def release_sd_pins():
     # ESP32 SPI driver ne oslobada bus instantno!
     time.sleep_ms(100)
 
-    # Step 3: SD pins that need to be released: 2, 4, 12, 13, 14, 15
-    # Per Emard: create Pin as INPUT, read value, delete
-    for i in bytearray([2, 4, 12, 13, 14, 15]):
-        try:
-            p = Pin(i, Pin.IN)
-            a = p.value()  # Force read to release driver
-            del p, a
-        except:
-            pass
-
-    # Step 3b: Takoder oslobodi SPI pinove (mogu biti razliciti od SD)
-    for pin_num in [gpio_mosi, gpio_miso, gpio_sck]:
-        try:
-            p = Pin(pin_num, Pin.IN)
-            a = p.value()
-            del p, a
-        except:
-            pass
+    # Step 3: SD pins (2, 4, 12, 13, 14, 15) + SPI pins to high-Z.
+    _pins_hiz()
+    _sd_released = True
 
-    gc.collect()
     print("SD pins released")
 
 
@@ -624,8 +832,14 @@ def mount_sd_with_retry(mount_point="/sd", max_retries=3):
     Returns:
         True if mounted successfully, False otherwise
     """
+    global _sd_released
     from machine import SDCard
 
+    # SDCard(slot=3) takes GPIO 4/12 from SPI: deinit the bus and clear
+    # _spi_instance first, so a later init_spi() rebuilds it instead of
+    # returning the stale handle (no-op if already released)
+    release_sd_pins()
+    _sd_released = False  # SD driver takes the pins
     # First, try to unmount if already mounted
     try:
         os.umount(mount_point)
@@ -640,11 +854,9 @@ def mount_sd_with_retry(mount_point="/sd", max_retries=3):
             sd = SDCard(slot=3)
             os.mount(sd, mount_point)
             print("SD mounted at {} (attempt {})".format(mount_point, attempt + 1))
-            gc.collect()
             return True
         except Exception as e:
             print("SD mount attempt {} failed: {}".format(attempt + 1, e))
-            gc.collect()
             time.sleep_ms(100)  # Wait before retry
 
     print("SD mount FAILED after {} attempts".format(max_retries))
@@ -679,9 +891,8 @@ def remount_sd():
 
     # Step 3: Wait for hardware to settle
     time.sleep_ms(200)
-    gc.collect()
 
-    # Step 4: Remount with retry
+    # Step 4: Remount with retry (collects before SDCard())
     result = mount_sd_with_retry("/sd", max_retries=3)
 
     if result:
@@ -728,19 +939,19 @@ def load(filename):
 
     try:
         with open(filename, "rb") as f:
-            file_data = f.read()
+            file_data = _read_file(f, filesize)
     except OSError as e:
         print("[RIM ERROR] Cannot read file: {}".format(e))
         return False
 
-    gc.collect()
     print("[RIM] File loaded into RAM ({} bytes)".format(len(file_data)))
 
     # Step 2: Now release SD pins and initialize SPI
     # NOTE: Commented out - SPI works without releasing SD pins on ULX3S v3.1.7
     # release_sd_pins()
 
-    # Initialize SPI with correct settings (1 MHz for stability)
+    # Initialize SPI with correct settings - init_spi() reuses the bus
+    # if it is already up, so repeated load() calls don't rebuild it
     print("[RIM] Step 3: Initializing SPI...")
     spi, cs = init_spi()
     print("[RIM] SPI ready")
@@ -774,19 +985,18 @@ def test():
     print("3. Testing OSD toggle...")
     try:
         ld._cs_active()
-        spi.write(bytearray([CMD_OSD_ENABLE]))
+        spi.write(spi_cmd_osd_on)
         ld._cs_inactive()
         time.sleep_ms(5000)
 
         ld._cs_active()
-        spi.write(bytearray([CMD_OSD_DISABLE]))
+        spi.write(spi_cmd_osd_off)
         ld._cs_inactive()
         print("   OSD toggle OK")
     except Exception as e:
         print("   OSD toggle FAILED: {}".format(e))
 
     print("=== SPI Test Complete ===")
-    gc.collect()
     return ld
 
 
@@ -819,10 +1029,76 @@ def test_minimal():
 # 4. Enable state tracking: enable bytearray za wait-for-release
 # =============================================================================
 
-# SPI command buffers (like C64 osd.py)
-spi_read_irq = bytearray([1, 0xF1, 0, 0, 0, 0, 0])  # 7 bytes
-spi_read_btn = bytearray([1, 0xFB, 0, 0, 0, 0, 0])  # 7 bytes
+@micropython.native
+def _fill_line(buf, off, text):
+    """Copy text into buf[off:off+32], space padded - OSD line body
+
+    text may be a str or already encoded bytes (OSD_LINE_BLANK ...). The
+    padding is copied from OSD_LINE_BLANK in place, so no padded temporary
+    string is built; only a str needs its one encode().
+    Truncated after encoding, so a line is never longer than 32 bytes.
+    """
+    buf[off:off + OSD_COLS] = OSD_LINE_BLANK
+    if not isinstance(text, (bytes, bytearray)):
+        text = str(text).encode('ascii', 'replace')
+    n = len(text)
+    if n > OSD_COLS:
+        n = OSD_COLS
+        text = text[:OSD_COLS]
+    buf[off:off + n] = text
+
+
+def _scan_dir(path):
+    """List path for the file browser: (names, isdir, sizes)
+
+    Sorted names of subdirectories and DIR_EXTS files, as the parallel
+    arrays OsdController keeps (see _set_dir()). os.ilistdir() already
+    returns type and (on FAT) size per entry, so no os.stat() - one FAT
+    directory walk instead of a lookup per file. os.ilistdir() errors
+    propagate to the caller, which then keeps its cached listing.
+    """
+    prefix = path if path.endswith("/") else path + "/"
+    # name -> size, -1 = directory. Small ints, so no per-entry tuple or
+    # list is allocated before the final arrays are built.
+    meta = {}
+    for e in os.ilistdir(path):
+        fname = e[0]
+        if e[1] == 0x4000:  # directory
+            meta[fname] = -1
+        elif fname[-4:] in DIR_EXTS:
+            if len(e) > 3:
+                size = e[3]
+            else:  # filesystem without size in ilistdir
+                try:
+                    size = os.stat(prefix + fname)[6]
+                except Exception as ex:
+                    print("stat error {}: {}".format(fname, ex))
+                    continue
+            meta[fname] = size
+    names = sorted(meta)  # filtered first - only shown entries are sorted
+    n = len(names)
+    isdir = bytearray(n)
+    sizes = array('I', range(n))  # sized once, every slot set below
+    for i in range(n):
+        size = meta[names[i]]
+        if size < 0:
+            isdir[i] = 1
+            size = 0
+        sizes[i] = size
+    gc.collect()  # once per listing, not per entry
+    return names, isdir, sizes
+
+
+# SPI command buffers (like C64 osd.py). Read commands are never modified,
+# so they are bytes (in flash when frozen); only results are bytearrays.
+spi_read_irq = bytes([1, 0xF1, 0, 0, 0, 0, 0])  # 7 bytes
+spi_read_btn = bytes([1, 0xFB, 0, 0, 0, 0, 0])  # 7 bytes
 spi_result = bytearray(7)
+# IRQ flags + buttons in one CS window: esp32_osd.v is back in IDLE after
+# each 7-byte frame, so the button response lands at 7 + 6 = byte 13
+spi_read_irq_btn = bytes([1, 0xF1, 0, 0, 0, 0, 0,
+                          1, 0xFB, 0, 0, 0, 0, 0])  # 14 bytes
+spi_result_irq_btn = bytearray(14)
 
 class OsdController:
     """OSD Controller with IRQ-driven button handling - C64 style"""
@@ -830,15 +1106,14 @@ class OsdController:
     def __init__(self, spi=None, cs=None):
         """Initialize OSD controller"""
         if spi is None or cs is None:
-            self.spi, self.cs = init_spi()
-        else:
-            self.spi = spi
-            self.cs = cs
+            spi, cs = init_spi()
+        self._set_spi(spi, cs)
 
         self.osd_visible = False
         self.menu_cursor = 0
         self.menu_items = []
         self._irq_enabled = False
+        self._irq_scheduled = False
 
         # Enable state tracking (like C64)
         # Bit 0: OSD visible
@@ -851,20 +1126,69 @@ class OsdController:
         self._btn_event = False
         self._osd_toggled = False  # Flag za OSD toggle event
 
+        # File browser state - always present, so init_fb()/read_dir() use
+        # plain attribute checks instead of hasattr() probes, and
+        # show_dir()/move_dir_cursor() work before an explicit init_fb()
+        self.cwd = None
+        self._clear_dir()
+
+        # Long-lived OSD buffers below: collect first so they are placed
+        # together instead of between short-lived garbage
+        gc.collect()
+
+        # Full OSD frame: 16 x (line command + 32 chars). esp32_osd.v returns
+        # to idle after the 32nd char, so all 16 line writes can be sent
+        # back to back under a single CS assertion.
+        self._osd_frame = bytearray(OSD_FRAME_BLANK)
+        self._osd_frame_mv = memoryview(self._osd_frame)
+        # Per-line views (command + 32 chars), so a line flush does not
+        # allocate a memoryview slice
+        self._osd_frame_lines = [
+            self._osd_frame_mv[i * OSD_LINE_LEN:(i + 1) * OSD_LINE_LEN]
+            for i in range(OSD_LINES)]
+        # fb_topitem the frame's directory lines were rendered for,
+        # -1 = frame no longer matches the screen (cursor moves redraw)
+        self._frame_top = -1
+        self.init_fb()
+
+        # Single button (BTN[0] masked out) -> action while OSD is on
+        self._btn_dispatch = {
+            BTN_UP: self.menu_up,
+            BTN_DOWN: self.menu_down,
+            BTN_LEFT: self.updir,
+            BTN_RIGHT: self.select_entry,
+            BTN_FIRE1: self.refresh_dir,  # FIRE1 = refresh directory listing
+        }
+
         # Ensure CS starts inactive (HIGH)
         self.cs.on()  # HIGH = inactive
 
+    def _set_spi(self, spi, cs):
+        """Attach SPI bus and CS pin, caching their bound methods
+
+        Called again whenever SPI is re-initialized after SD access.
+        """
+        self.spi = spi
+        self.cs = cs
+        self._cs_on = cs.on
+        self._cs_off = cs.off
+        self._spi_write = spi.write
+        self._spi_xfer = spi.write_readinto
+
     def _cs_active(self):
         """Activate CS (active low) = LOW = off()
 
         FIXED 2026-02-13: Pin.on()=HIGH, Pin.off()=LOW
         CS is active-low, so LOW = active
         """
-        self.cs.off()  # LOW = active
+        self._cs_off()  # LOW = active
 
     def _cs_inactive(self):
         """Deactivate CS = HIGH = on()"""
-        self.cs.on()  # HIGH = inactive
+        self._cs_on()  # HIGH = inactive
+
+    # Like ld_pdp1, OSD writes and reads use the cached self._cs_off() /
+    # self._cs_on() directly; the wrappers above stay for external callers.
 
     # =========================================================================
     # IRQ Handling - FIXED to match C64 osd.py
@@ -875,8 +1199,11 @@ class OsdController:
         try:
             # FIXED 2026-02-14: FPGA drives IRQ active-high, use PULL_DOWN + RISING
             self.irq_pin = Pin(gpio_irq, Pin.IN, Pin.PULL_DOWN)
+            # Bind both callbacks up front - a hard IRQ must not allocate
             self._irq_handler_ref = self._irq_handler  # Prevent GC
-            self.irq_pin.irq(trigger=Pin.IRQ_RISING, handler=self._irq_handler_ref)
+            self._irq_service_ref = self._irq_service
+            self.irq_pin.irq(trigger=Pin.IRQ_RISING, handler=self._irq_handler_ref,
+                             hard=True)
             self._irq_enabled = True
             print("IRQ on GPIO{} (PULL_DOWN, RISING)".format(gpio_irq))
             print("OSD combo: UP+DOWN+LEFT+RIGHT (4 tipke)")
@@ -893,30 +1220,40 @@ class OsdController:
             except:
                 pass
 
+    @micropython.native
     def _irq_handler(self, pin):
-        """Handle IRQ from FPGA - MINIMAL ISR, BEZ PRINT!
+        """Hard IRQ from FPGA - only schedules _irq_service()
 
-        FIXED 2026-02-14: ISR ne smije:
+        ISR ne smije:
         - print() - ZABRANJENO (I/O)
-        - .format() - ZABRANJENO (alocira memoriju)
-        - Kompleksne operacije - ZABRANJENO
+        - alocirati memoriju (.format(), bytearray, bound metode)
+        - SPI - driver nije siguran iz ISR konteksta
 
-        ISR samo cita SPI i postavlja flagove.
+        Repeated IRQs while a service call is still queued are coalesced.
+        Native code: the body runs with interrupts held off, keep it short.
+        """
+        if self._irq_scheduled:
+            return
+        self._irq_scheduled = True
+        try:
+            micropython.schedule(self._irq_service_ref, 0)
+        except RuntimeError:  # schedule queue full - retry on next IRQ
+            self._irq_scheduled = False
+
+    def _irq_service(self, arg):
+        """Scheduled IRQ bottom half - reads IRQ flags and buttons via SPI
+
+        Samo cita SPI i postavlja flagove.
         poll_events() procesira evente iz main loop-a.
         """
-        # FAZA 1: Check IRQ flag (Emardov pristup)
-        self._cs_active()
-        self.spi.write_readinto(spi_read_irq, spi_result)
-        self._cs_inactive()
-        btn_irq = spi_result[6]  # BYTE 6 per Emard!
+        self._irq_scheduled = False
+
+        # FAZA 1 + 2: IRQ flag i button status u jednoj transakciji
+        res = self.read_irq_buttons()
 
         # Check if it's a button event (bit 7 = IRQ pending)
-        if btn_irq & 0x80:
-            # FAZA 2: Read button status (also clears IRQ)
-            self._cs_active()
-            self.spi.write_readinto(spi_read_btn, spi_result)
-            self._cs_inactive()
-            btn = spi_result[6]  # BYTE 6 per Emard!
+        if res[6] & 0x80:
+            btn = res[13]
 
             # SAMO postavi flag - NEMA PRINT!
             if btn > 1:
@@ -937,7 +1274,8 @@ class OsdController:
         btn = self._pending_btn
 
         # Debug output - OVDJE JE SIGURNO jer smo izvan ISR-a
-        print("BTN: 0x{:02x}".format(btn))
+        if _DEBUG:
+            print("BTN: 0x%02x" % btn)
 
         # State machine (Emardov pristup)
         if self.enable[0] & 2:  # Wait for all buttons released
@@ -948,8 +1286,8 @@ class OsdController:
             if (btn & 0x78) == 0x78:
                 self.enable[0] = (self.enable[0] ^ 1) | 2  # Toggle OSD, set wait
                 self._osd_enable_hw(self.enable[0] & 1)
-                self.osd_visible = bool(self.enable[0] & 1)
-                print("OSD toggle: {}".format("ON" if self.osd_visible else "OFF"))
+                self.osd_visible = (self.enable[0] & 1) != 0
+                print("OSD toggle: %s" % ("ON" if self.osd_visible else "OFF"))
                 if self.osd_visible:
                     # Use cached directory listing (populated at startup)
                     self.show_dir()
@@ -957,76 +1295,123 @@ class OsdController:
             # Normal button handling when OSD visible
             elif self.enable[0] == 1:  # OSD on, not waiting
                 # Single button press detection (with BTN[0] possibly set)
-                btn_only = btn & 0x7E  # Mask out BTN[0]
-                if btn_only == BTN_UP:
-                    self.menu_up()
-                elif btn_only == BTN_DOWN:
-                    self.menu_down()
-                elif btn_only == BTN_LEFT:
-                    self.updir()
-                elif btn_only == BTN_RIGHT:
-                    self.select_entry()
-                elif btn_only == BTN_FIRE1:
-                    # FIRE1 = refresh directory listing
-                    self.refresh_dir()
+                handler = self._btn_dispatch.get(btn & 0x7E)  # Mask out BTN[0]
+                if handler:
+                    handler()
 
     # =========================================================================
     # SPI Communication - C64 style with write_readinto
     # =========================================================================
-
+    # Each read is ONE full-duplex write_readinto transaction. The 7-byte
+    # frame is kept: the response byte position (6) is what was verified on
+    # hardware, a shorter 2-byte frame has not been.
+    #
+    # Shorter frames (checked against the RTL, 2026-10-15): esp32_spi_slave.v
+    # drives MISO straight from tx_data, and esp32_osd.v rewrites tx_data
+    # with the button state every clk_sys cycle (the 0xF1/0xFB responses
+    # are one-cycle loads). So bytes 1..6 all carry the button state and a
+    # 2-byte [1, 0xFB] frame would likely return it in byte 1 - but that
+    # also means the 0xF1 IRQ byte rarely shows bit 7. Both need a
+    # hardware test before the frame is cut; until then a 7-byte read is
+    # 56 us at spi_freq (14 us at 4 MHz), well under the poll period.
+    # Result is read by integer index (spi_result[6]) - no slice copy, and
+    # a memoryview would not help: MicroPython indexes both through the
+    # same buffer subscr, memoryview only adds an indirection.
+
+    @micropython.native
     def read_irq_flags(self):
         """Read IRQ flags from FPGA
 
         FIXED 2026-02-14: Use byte 6 per Emardov pristup!
         C64 FPGA adds 4 dummy bytes delay, we must match this.
         """
-        self._cs_active()
-        self.spi.write_readinto(spi_read_irq, spi_result)
-        self._cs_inactive()
+        self._cs_off()
+        self._spi_xfer(spi_read_irq, spi_result)
+        self._cs_on()
         return spi_result[6]  # FIXED: Position 6 per Emard!
 
+    @micropython.native
     def read_buttons(self):
         """Read button status from FPGA (also clears button IRQ)
 
         FIXED 2026-02-14: Use byte 6 per Emardov pristup!
         """
-        self._cs_active()
-        self.spi.write_readinto(spi_read_btn, spi_result)
-        self._cs_inactive()
+        self._cs_off()
+        self._spi_xfer(spi_read_btn, spi_result)
+        self._cs_on()
         return spi_result[6]  # FIXED: Position 6 per Emard!
 
+    @micropython.native
+    def read_irq_buttons(self):
+        """Read IRQ flags and button status in a single CS window
+
+        Returns the 14-byte result buffer: [6] = IRQ flags, [13] = buttons.
+        The button read also clears the IRQ; the value is only used when
+        bit 7 of the flags was set, same as the two-read sequence.
+        """
+        self._cs_off()
+        self._spi_xfer(spi_read_irq_btn, spi_result_irq_btn)
+        self._cs_on()
+        return spi_result_irq_btn
+
     def _osd_enable_hw(self, en):
         """Low-level OSD enable/disable - MiSTer compatible (0x41=ON, 0x40=OFF)
 
         FIXED 2026-02-14: esp32_osd.v expects MiSTer format - single byte command.
         0x41 = OSD enable, 0x40 = OSD disable
         """
-        self._cs_active()
-        self.spi.write(bytearray([0x41 if en else 0x40]))
-        self._cs_inactive()
+        self._cs_off()
+        self._spi_write(spi_cmd_osd_on if en else spi_cmd_osd_off)
+        self._cs_on()
 
-    def osd_enable(self, enable):
-        """Enable or disable OSD overlay - MiSTer compatible (0x41=ON, 0x40=OFF)"""
-        self._cs_active()
-        self.spi.write(bytearray([0x41 if enable else 0x40]))
-        self._cs_inactive()
+    # Public name for the same command (main.py, external callers)
+    osd_enable = _osd_enable_hw
 
     def osd_write_line(self, line, text):
         """Write text to OSD line (0-15, max 32 chars)"""
-        if line < 0 or line > 15:
+        if line < 0 or line >= OSD_LINES:
             return
-        # Pad or truncate to 32 chars (MicroPython compatible)
-        text = str(text)[:32]
-        text = text + ' ' * (32 - len(text))  # Manual padding
-        self._cs_active()
-        self.spi.write(bytearray([CMD_OSD_WRITE + line]))
-        self.spi.write(text.encode('ascii', 'replace'))
-        self._cs_inactive()
+        # The line's slot in the OSD frame is its preallocated buffer:
+        # command byte already in place, text rendered behind it, sent as
+        # one SPI transaction - and the frame keeps matching the screen
+        self._frame_line(line, text)
+        if 0 < line < 15:
+            self._frame_top = -1  # directory area overwritten
+        self._osd_flush_line(line)
+
+    def osd_write_lines(self, lines):
+        """Write a whole screen: lines[0..15], missing lines are blanked
+
+        All 16 line writes go out back to back in one SPI transaction
+        instead of one osd_write_line() call per line.
+        """
+        n = len(lines)
+        for i in range(OSD_LINES):
+            self._frame_line(i, lines[i] if i < n else OSD_LINE_BLANK)
+        self._frame_top = -1
+        self._osd_flush()
+
+    def _frame_line(self, line, text):
+        """Render text into one line of the OSD frame (no SPI traffic)"""
+        _fill_line(self._osd_frame, line * OSD_LINE_LEN + 1, text)
+
+    def _osd_flush(self):
+        """Send the whole OSD frame (all 16 lines) in one SPI transaction"""
+        self._cs_off()
+        self._spi_write(self._osd_frame)
+        self._cs_on()
+
+    def _osd_flush_line(self, line):
+        """Send one line of the OSD frame (command + 32 chars)"""
+        self._cs_off()
+        self._spi_write(self._osd_frame_lines[line])
+        self._cs_on()
 
     def osd_clear(self):
-        """Clear all OSD lines"""
-        for i in range(16):
-            self.osd_write_line(i, "")
+        """Clear all OSD lines - blank frame image, one SPI transaction"""
+        self._osd_frame[:] = OSD_FRAME_BLANK
+        self._frame_top = -1
+        self._osd_flush()
 
     # =========================================================================
     # File Browser System - C64 style
@@ -1037,20 +1422,33 @@ class OsdController:
     def init_fb(self):
         """Initialize file browser state
 
-        FIXED 2026-02-14: NE BRIŠE direntries cache!
+        FIXED 2026-02-14: NE BRIŠE directory cache!
         Cache se briše samo eksplicitno kroz read_dir().
         """
         self.fb_topitem = 0
         self.fb_cursor = 0
         self.fb_selected = -1
+        self._frame_top = -1
         # FIXED: Ne postavljaj cwd na "/" ako već postoji
-        if not hasattr(self, 'cwd') or self.cwd is None:
+        if self.cwd is None:
             self.cwd = "/"
-        # FIXED: Ne briši direntries cache!
-        if not hasattr(self, 'direntries'):
-            self.direntries = []
+        # FIXED: Ne briši directory cache! (postavljen u __init__)
         self.screen_y = 14  # OSD lines for directory display (lines 1-14)
 
+    # Directory cache - parallel arrays instead of one [name, isdir, size]
+    # list per file: dir_names (str), dir_isdir (bytearray 0/1) and
+    # dir_sizes (array 'I'), all indexed by entry position.
+
+    def _set_dir(self, names, isdir, sizes):
+        """Replace the directory cache"""
+        self.dir_names = names
+        self.dir_isdir = isdir
+        self.dir_sizes = sizes
+
+    def _clear_dir(self):
+        """Empty the directory cache"""
+        self._set_dir([], bytearray(), array('I'))
+
     def read_dir(self, force_remount=False):
         """Read directory contents with SD recovery
 
@@ -1063,10 +1461,8 @@ class OsdController:
         SD card may not be accessible. If directory read fails, keep existing
         cached entries.
         """
-        if not hasattr(self, 'cwd'):
+        if self.cwd is None:
             self.cwd = "/"
-        if not hasattr(self, 'direntries'):
-            self.direntries = []
 
         # If force_remount, do full SD recovery
         if force_remount:
@@ -1078,37 +1474,18 @@ class OsdController:
             # Remount SD
             if remount_sd():
                 # Reinit SPI after SD remount
-                self.spi, self.cs = init_spi()
+                self._set_spi(*init_spi())
             else:
                 print("read_dir: Remount failed, using cache")
                 return
 
         # Try to read directory, but don't clear existing cache if it fails
-        new_entries = []
         read_ok = False
 
         try:
-            ls = sorted(os.listdir(self.cwd))
-            for fname in ls:
-                try:
-                    fullpath = self.fullpath(fname)
-                    stat = os.stat(fullpath)
-                    if stat[0] & 0o170000 == 0o040000:
-                        new_entries.append([fname, 1, 0])  # directory
-                    else:
-                        # Filter: only show .rim, .bin, .bit files
-                        if fname.endswith('.rim') or fname.endswith('.bin') or fname.endswith('.bit') or fname.endswith('.hex'):
-                            new_entries.append([fname, 0, stat[6]])  # file
-                except:
-                    pass
-                gc.collect()
-
-            # Only update if we got entries (SD was accessible)
-            if new_entries or len(ls) == 0:
-                self.direntries = new_entries
-                read_ok = True
-                print("read_dir: {} entries".format(len(new_entries)))
-
+            self._set_dir(*_scan_dir(self.cwd))
+            read_ok = True
+            print("read_dir: {} entries".format(len(self.dir_names)))
         except OSError as e:
             # Error 0x107 = SD read error
             if "107" in str(e) or "ETIMEDOUT" in str(e):
@@ -1142,7 +1519,7 @@ class OsdController:
         6. Citaj direktorij
         7. Reinit SPI
         """
-        global _spi_instance
+        global _spi_instance, _sd_released
 
         print(">>> read_dir_safe START")
         print("    cwd={}".format(self.cwd))
@@ -1171,29 +1548,12 @@ class OsdController:
         print("    SPI settle delay OK")
 
         # Step 2: Release SD pins to high-Z (Emard pattern)
+        # Takoder SPI pinovi (MOSI=4, MISO=12, SCK=26) jer slot=3 koristi
+        # ISTE pinove!
         print(">>> Step 2: Release SD pins to high-Z...")
-        for i in bytearray([2, 4, 12, 13, 14, 15]):
-            try:
-                p = Pin(i, Pin.IN)
-                a = p.value()
-                del p, a
-            except:
-                pass
-
-        # Step 2b: Takoder oslobodi SPI pinove (MOSI=4, MISO=12, SCK=26)
-        # Ovo je DODATNI korak jer slot=3 koristi ISTE pinove!
-        for pin_num in [gpio_mosi, gpio_miso, gpio_sck]:
-            try:
-                p = Pin(pin_num, Pin.IN)
-                a = p.value()
-                del p, a
-            except:
-                pass
+        _pins_hiz()
         print("    All pins released")
 
-        # Step 2c: Force GC da ukloni sve reference
-        gc.collect()
-
         # Step 3: Unmount SD (KRITIČNO - mora se unmountat prije remount!)
         print(">>> Step 3: Unmount SD...")
         try:
@@ -1210,6 +1570,7 @@ class OsdController:
         # Step 5: Mount SD with slot=3 (SPI MODE - KRITIČNO!)
         print(">>> Step 5: Mount SD with slot=3 (SPI mode)...")
         from machine import SDCard
+        _sd_released = False  # SD driver takes the pins
         sd_ok = False
         for attempt in range(3):
             try:
@@ -1224,37 +1585,21 @@ class OsdController:
 
         if not sd_ok:
             print(">>> SD mount FAILED, using cached entries")
-            self.spi, self.cs = init_spi()
+            self._set_spi(*init_spi())
             return
 
         # Step 6: Read directory (SD now properly mounted in SPI mode)
         print(">>> Step 6: Reading directory {}...".format(self.cwd))
-        new_entries = []
         try:
-            ls = sorted(os.listdir(self.cwd))
-            print("    Found {} items".format(len(ls)))
-            for fname in ls:
-                try:
-                    fullpath = self.fullpath(fname)
-                    stat = os.stat(fullpath)
-                    if stat[0] & 0o170000 == 0o040000:
-                        new_entries.append([fname, 1, 0])  # directory
-                    else:
-                        # Filter: only show .rim, .bin, .bit files
-                        if fname.endswith('.rim') or fname.endswith('.bin') or fname.endswith('.bit') or fname.endswith('.hex'):
-                            new_entries.append([fname, 0, stat[6]])  # file
-                except Exception as e:
-                    print("    stat error {}: {}".format(fname, e))
-                gc.collect()
-            self.direntries = new_entries
-            print(">>> Step 6 OK: {} entries".format(len(new_entries)))
+            self._set_dir(*_scan_dir(self.cwd))
+            print(">>> Step 6 OK: {} entries".format(len(self.dir_names)))
         except Exception as e:
             print(">>> Step 6 ERROR: {}".format(e))
-            print("    Keeping {} cached entries".format(len(self.direntries)))
+            print("    Keeping {} cached entries".format(len(self.dir_names)))
 
         # Step 7: Reinit SPI for OSD communication
         print(">>> Step 7: Reinit SPI...")
-        self.spi, self.cs = init_spi()
+        self._set_spi(*init_spi())
         print("    SPI reinit OK")
 
         gc.collect()
@@ -1271,53 +1616,111 @@ class OsdController:
         else:
             return self.cwd + "/" + fname
 
-    def show_dir(self):
-        """Display directory listing on OSD"""
+    def show_dir(self, footer=OSD_DIR_FOOTER):
+        """Display directory listing on OSD (one batched SPI transaction)
+
+        footer: line 15 text, rendered into the same transaction
+        """
         # Header
-        self.osd_write_line(0, "=== {} ===".format(self.cwd[:26]))
+        self._frame_line(0, "=== %s ===" % self.cwd[:26])
 
         # Directory entries
+        frame_dir_line = self._frame_dir_line
         for i in range(self.screen_y):
-            self.show_dir_line(i)
+            frame_dir_line(i)
 
-        # Footer with instructions
-        self.osd_write_line(15, "U/D:Nav L:Bk R:Sel FIRE1:Rfsh")
+        # Footer with instructions (or status text)
+        self._frame_line(15, footer)
+
+        self._osd_flush()
+        self._frame_top = self.fb_topitem
 
     def show_dir_line(self, y):
         """Show single directory line - C64 style"""
         if y < 0 or y >= self.screen_y:
             return
+        self._frame_dir_line(y)
+        self._osd_flush_line(y + 1)
 
-        # Markers: space, cursor (>), selected (*)
-        smark = [' ', '>', '*']
+    def show_dir_mark(self, y):
+        """Redraw only the marker of directory line y
 
-        mark = 0
-        invert = 0
-        if y == self.fb_cursor - self.fb_topitem:
-            mark = 1
-            invert = 1
+        Cursor moves inside the screen change just the first character of
+        two lines; when the frame still holds this page, patch that byte
+        instead of reformatting the whole line.
+        """
+        if y < 0 or y >= self.screen_y:
+            return
+        if self._frame_top != self.fb_topitem:
+            self.show_dir_line(y)
+            return
+        if y + self.fb_topitem >= len(self.dir_names):
+            return
+        self._osd_frame[(y + 1) * OSD_LINE_LEN + 1] = self._dir_mark(y)
+        self._osd_flush_line(y + 1)
+
+    def _dir_mark(self, y):
+        """Marker character code for directory line y"""
+        # Markers: space, cursor (>), selected (*)
         if y == self.fb_selected - self.fb_topitem:
-            mark = 2
+            return 0x2A  # '*'
+        if y == self.fb_cursor - self.fb_topitem:
+            return 0x3E  # '>'
+        return 0x20
+
+    @micropython.native
+    def _frame_dir_line(self, y):
+        """Render directory line y (0 .. screen_y-1) into the OSD frame
 
+        Layout: marker, name (26), then " DIR" or the size right aligned
+        in the last 4 columns. Written in place - no format()/padding,
+        no str() for the size digits. Native: runs for every line of every
+        redraw, and the digit loop is plain integer arithmetic.
+        """
+        off = (y + 1) * OSD_LINE_LEN + 1
+        buf = self._osd_frame
+        buf[off:off + OSD_COLS] = OSD_LINE_BLANK
         i = y + self.fb_topitem
-        if i >= len(self.direntries):
-            self.osd_write_line(y + 1, "")
+        if i >= len(self.dir_names):
             return
 
-        entry = self.direntries[i]
-        if entry[1]:  # directory
-            line = "{}{:<26}  DIR".format(smark[mark], entry[0][:26])
+        buf[off] = self._dir_mark(y)
+        # Cut after encoding: MicroPython's encode() ignores errors= and
+        # returns UTF-8, so 26 chars can be up to 78 bytes
+        name = self.dir_names[i].encode('ascii', 'replace')[:26]
+        buf[off + 1:off + 1 + len(name)] = name
+        if self.dir_isdir[i]:  # directory
+            buf[off + 29:off + 32] = b"DIR"
         else:  # file
-            size = entry[2]
+            size = self.dir_sizes[i]
             if size >= 1024*1024:
-                sizestr = "{}M".format(size // (1024*1024))
+                size //= 1024*1024
+                sfx = 0x4D  # 'M'
             elif size >= 1024:
-                sizestr = "{}K".format(size // 1024)
+                size //= 1024
+                sfx = 0x4B  # 'K'
             else:
-                sizestr = "{}".format(size)
-            line = "{}{:<26} {:>4}".format(smark[mark], entry[0][:26], sizestr[:4])
-
-        self.osd_write_line(y + 1, line)
+                sfx = 0
+            # Digits written right to left straight into the frame
+            n = 1
+            t = size
+            while t >= 10:
+                t //= 10
+                n += 1
+            end = off + OSD_COLS
+            if sfx and n < 4:
+                buf[end - 1] = sfx
+                end -= 1
+            else:
+                while n > 4:  # as before: "1023K" shows as "1023"
+                    size //= 10
+                    n -= 1
+            while True:
+                end -= 1
+                buf[end] = 0x30 + size % 10
+                size //= 10
+                if not size:
+                    break
 
     def refresh_dir(self):
         """Refresh directory listing with SD remount - FIXED 2026-02-14
@@ -1327,34 +1730,36 @@ class OsdController:
 
         DEBUG 2026-02-14: Koristi read_dir_safe() umjesto read_dir(force_remount)
         """
-        print("=== refresh_dir() CALLED ===")
+        if _DEBUG:
+            print("=== refresh_dir() CALLED ===")
         self.osd_write_line(15, "Refreshing...")
-        old_count = len(self.direntries)
+        old_count = len(self.dir_names)
 
         # Clear cache and use read_dir_safe (deinits SPI, remounts if needed)
-        self.direntries = []
+        self._clear_dir()
         self.read_dir_safe()
 
-        new_count = len(self.direntries)
+        new_count = len(self.dir_names)
 
         if new_count != old_count:
             # Directory changed, reset cursor
             self.fb_cursor = 0
             self.fb_topitem = 0
 
-        self.show_dir()
+        # Listing + status footer in one transaction
         if new_count > 0:
-            self.osd_write_line(15, "OK: {} files".format(new_count))
+            self.show_dir("OK: %d files" % new_count)
         else:
-            self.osd_write_line(15, "SD ERROR - press FIRE1")
-        print("=== refresh_dir() DONE ===")
+            self.show_dir("SD ERROR - press FIRE1")
+        if _DEBUG:
+            print("=== refresh_dir() DONE ===")
 
     def move_dir_cursor(self, step):
         """Move cursor in directory - C64 style"""
         oldcursor = self.fb_cursor
 
         if step == 1:  # DOWN
-            if self.fb_cursor < len(self.direntries) - 1:
+            if self.fb_cursor < len(self.dir_names) - 1:
                 self.fb_cursor += 1
         elif step == -1:  # UP
             if self.fb_cursor > 0:
@@ -1363,19 +1768,53 @@ class OsdController:
         if oldcursor != self.fb_cursor:
             screen_line = self.fb_cursor - self.fb_topitem
             if 0 <= screen_line < self.screen_y:
-                # Move cursor inside screen, no scroll
-                self.show_dir_line(oldcursor - self.fb_topitem)
-                self.show_dir_line(screen_line)
+                # Move cursor inside screen, no scroll - only the two
+                # markers change
+                self.show_dir_mark(oldcursor - self.fb_topitem)
+                self.show_dir_mark(screen_line)
             else:
                 # Scroll needed
                 if screen_line < 0:
                     if self.fb_topitem > 0:
                         self.fb_topitem -= 1
-                        self.show_dir()
+                        self.scroll_dir(-1)
                 else:
-                    if self.fb_topitem + self.screen_y < len(self.direntries):
+                    if self.fb_topitem + self.screen_y < len(self.dir_names):
                         self.fb_topitem += 1
-                        self.show_dir()
+                        self.scroll_dir(1)
+
+    def scroll_dir(self, step):
+        """Repaint the directory area after fb_topitem moved by step (+-1)
+
+        The OSD has no hardware scroll, so all 14 entry lines change on
+        screen - but 13 of them are already rendered in the frame, one
+        line off. Shift them in RAM, render only the new line and fix the
+        old cursor marker, then send lines 1-14 in one transaction.
+        Falls back to show_dir() when the frame is not the previous page.
+        """
+        if self._frame_top != self.fb_topitem - step:
+            self.show_dir()
+            return
+        buf = self._osd_frame
+        n = self.screen_y
+        if step > 0:
+            buf[OSD_LINE_LEN:n * OSD_LINE_LEN] = \
+                buf[2 * OSD_LINE_LEN:(n + 1) * OSD_LINE_LEN]
+            new_y = n - 1
+        else:
+            buf[2 * OSD_LINE_LEN:(n + 1) * OSD_LINE_LEN] = \
+                buf[OSD_LINE_LEN:n * OSD_LINE_LEN]
+            new_y = 0
+        # Line command bytes moved along with the text - restore them
+        for y in range(1, n + 1):
+            buf[y * OSD_LINE_LEN] = CMD_OSD_WRITE + y
+        self._frame_dir_line(new_y)
+        old_y = new_y - step  # previous cursor line, now one line further
+        buf[(old_y + 1) * OSD_LINE_LEN + 1] = self._dir_mark(old_y)
+        self._frame_top = self.fb_topitem
+        self._cs_off()
+        self._spi_write(self._osd_frame_mv[OSD_LINE_LEN:(n + 1) * OSD_LINE_LEN])
+        self._cs_on()
 
     def select_entry(self):
         """Select current entry - directory or file
@@ -1383,24 +1822,28 @@ class OsdController:
         FIXED 2026-02-14: Sprema cwd PRIJE init_fb() jer init_fb() sada ne briše.
         DEBUG 2026-02-14: Dodani ispisi za provjeru poziva read_dir_safe()
         """
-        print("=== select_entry() CALLED ===")
-        print("    direntries count: {}".format(len(self.direntries) if self.direntries else 0))
-        print("    fb_cursor: {}".format(self.fb_cursor))
+        if _DEBUG:
+            print("=== select_entry() CALLED ===")
+            print("    dir entries count: %d" % len(self.dir_names))
+            print("    fb_cursor: %d" % self.fb_cursor)
 
-        if not self.direntries or self.fb_cursor >= len(self.direntries):
+        if self.fb_cursor >= len(self.dir_names):
             print("    ERROR: No entry at cursor position!")
             return
 
-        entry = self.direntries[self.fb_cursor]
-        print("    Selected: {} (is_dir={})".format(entry[0], entry[1]))
+        fname = self.dir_names[self.fb_cursor]
+        is_dir = self.dir_isdir[self.fb_cursor]
+        if _DEBUG:
+            print("    Selected: %s (is_dir=%d)" % (fname, is_dir))
 
-        if entry[1]:  # Directory
+        if is_dir:  # Directory
             oldselected = self.fb_selected - self.fb_topitem
             self.fb_selected = self.fb_cursor
 
             # Izracunaj novi cwd PRIJE reset-a
-            new_cwd = self.fullpath(entry[0])
-            print("    Entering directory: {}".format(new_cwd))
+            new_cwd = self.fullpath(fname)
+            if _DEBUG:
+                print("    Entering directory: %s" % new_cwd)
 
             self.show_dir_line(oldselected)
             self.show_dir_line(self.fb_cursor - self.fb_topitem)
@@ -1412,15 +1855,14 @@ class OsdController:
 
             # Postavi novi cwd i citaj direktorij
             self.cwd = new_cwd
-            self.direntries = []  # Eksplicitno brisi stari cache
-            print("    Calling read_dir_safe()...")
+            self._clear_dir()  # Eksplicitno brisi stari cache
             self.read_dir_safe()  # FIXED 2026-02-14: Deinit SPI prije SD citanja!
-            print("    read_dir_safe() returned, showing dir...")
             self.show_dir()
-            print("=== select_entry() DONE ===")
+            if _DEBUG:
+                print("=== select_entry() DONE ===")
         else:  # File
-            print("    Loading file: {}".format(entry[0]))
-            self.load_file(entry[0])
+            print("Loading file: %s" % fname)
+            self.load_file(fname)
 
     def updir(self):
         """Go up one directory level
@@ -1428,30 +1870,28 @@ class OsdController:
         FIXED 2026-02-14: Eksplicitno brise cache i postavlja cwd.
         DEBUG 2026-02-14: Dodani ispisi za provjeru poziva read_dir_safe()
         """
-        print("=== updir() CALLED ===")
-        print("    Current cwd: {}".format(self.cwd))
+        if _DEBUG:
+            print("=== updir() CALLED ===")
+            print("    Current cwd: %s" % self.cwd)
 
-        if len(self.cwd) < 2:
-            self.cwd = "/"
-        else:
-            parts = self.cwd.split("/")[:-1]
-            self.cwd = "/".join(parts) if parts else "/"
-            if not self.cwd:
-                self.cwd = "/"
+        # Parent = everything before the last "/" (one slice, no list);
+        # "/sd" and "/" both go to "/"
+        i = self.cwd.rfind("/")
+        self.cwd = self.cwd[:i] if i > 0 else "/"
 
-        print("    New cwd: {}".format(self.cwd))
+        if _DEBUG:
+            print("    New cwd: %s" % self.cwd)
 
         # Reset browser state
         self.fb_topitem = 0
         self.fb_cursor = 0
         self.fb_selected = -1
-        self.direntries = []  # Eksplicitno brisi stari cache
+        self._clear_dir()  # Eksplicitno brisi stari cache
 
-        print("    Calling read_dir_safe()...")
         self.read_dir_safe()  # FIXED 2026-02-14: Deinit SPI prije SD citanja!
-        print("    read_dir_safe() returned, showing dir...")
         self.show_dir()
-        print("=== updir() DONE ===")
+        if _DEBUG:
+            print("=== updir() DONE ===")
 
     def load_file(self, fname):
         """Load selected file
@@ -1474,7 +1914,7 @@ class OsdController:
         - Preskoči SD mount/unmount
         - Citaj direktno s flash memorije
         """
-        global _spi_instance
+        global _spi_instance, _sd_released
         fullpath = self.fullpath(fname)
 
         # FIXED 2026-02-14: Provjeri da li je fajl na SD ili flash
@@ -1518,32 +1958,16 @@ class OsdController:
         if is_sd_file:
             # Step 2: Release SD pins to high-Z (Emard pattern)
             # KRITIČNO: GPIO moraju biti high-Z prije SD mount-a!
+            # Takoder SPI pinovi (MOSI=4, MISO=12, SCK=26) jer slot=3
+            # koristi ISTE pinove!
             print("load_file: Release pins to high-Z...")
-            for i in bytearray([2, 4, 12, 13, 14, 15]):
-                try:
-                    p = Pin(i, Pin.IN)
-                    a = p.value()  # Force read to release driver
-                    del p, a
-                except:
-                    pass
-
-            # 2b. Takoder oslobodi SPI pinove (MOSI=4, MISO=12, SCK=26)
-            # Ovo je DODATNI korak jer slot=3 koristi ISTE pinove!
-            for pin_num in [gpio_mosi, gpio_miso, gpio_sck]:
-                try:
-                    p = Pin(pin_num, Pin.IN)
-                    a = p.value()
-                    del p, a
-                except:
-                    pass
+            _pins_hiz()
             print("  Pins released")
 
-            # 2c. Force garbage collection da ukloni sve reference
-            gc.collect()
-
             # Step 3: Mount SD with slot=3 (SPI mode)
             print("load_file: Mount SD slot=3...")
             from machine import SDCard
+            _sd_released = False  # SD driver takes the pins
 
             # 3a. Unmount ako je mountano
             try:
@@ -1569,7 +1993,7 @@ class OsdController:
 
             if not sd_ok:
                 print("load_file: SD mount FAILED!")
-                self.spi, self.cs = init_spi()
+                self._set_spi(*init_spi())
                 self._osd_enable_hw(1)
                 self.enable[0] = 1
                 self.osd_visible = True
@@ -1601,7 +2025,7 @@ class OsdController:
                     except:
                         pass
                     release_sd_pins()
-                self.spi, self.cs = init_spi()
+                self._set_spi(*init_spi())
                 # NOW disable OSD (SPI is ready)
                 self._osd_enable_hw(0)
             except Exception as e:
@@ -1614,7 +2038,7 @@ class OsdController:
                     except:
                         pass
                     release_sd_pins()
-                self.spi, self.cs = init_spi()
+                self._set_spi(*init_spi())
                 self._osd_enable_hw(1)
                 self.enable[0] = 1
                 self.osd_visible = True
@@ -1635,10 +2059,13 @@ class OsdController:
             self.osd_visible = False
 
             # Step 4: Read file into memory
+            # SD i SPI dijele pinove - SD se ne moze citati dok traje
+            # SPI transfer, pa se fajl cita CIJELI prije Step 7.
+            # _read_file(): preallocated spi_load_buf, no file-sized alloc
             print("[RIM] Step 4: Reading file...")
             try:
                 with open(fullpath, "rb") as f:
-                    file_data = f.read()
+                    file_data = _read_file(f, os.stat(fullpath)[6])
                 print("[RIM] File read OK: {} bytes".format(len(file_data)))
             except Exception as e:
                 print("[RIM ERROR] File read failed: {}".format(e))
@@ -1650,7 +2077,7 @@ class OsdController:
                     except:
                         pass
                     release_sd_pins()
-                self.spi, self.cs = init_spi()
+                self._set_spi(*init_spi())
                 self._osd_enable_hw(1)
                 self.enable[0] = 1
                 self.osd_visible = True
@@ -1677,7 +2104,7 @@ class OsdController:
 
             # Step 7: Reinitialize SPI (pins now free from SD)
             print("[RIM] Step 7: Reinitializing SPI...")
-            self.spi, self.cs = init_spi()
+            self._set_spi(*init_spi())
             print("[RIM] SPI ready")
 
             # Step 7b: NOW disable OSD (SPI is ready)
@@ -1730,7 +2157,7 @@ class OsdController:
                     except:
                         pass
                     release_sd_pins()
-                self.spi, self.cs = init_spi()
+                self._set_spi(*init_spi())
                 self._osd_enable_hw(1)
                 self.enable[0] = 1
                 self.osd_visible = True
@@ -1751,7 +2178,7 @@ class OsdController:
 
             # Step 7: Reinitialize SPI
             print("[HEX] Step 7: Reinitializing SPI...")
-            self.spi, self.cs = init_spi()
+            self._set_spi(*init_spi())
 
             # Disable OSD
             self._osd_enable_hw(0)
@@ -1761,49 +2188,11 @@ class OsdController:
             # Data starts at address 0, but ENTRY POINT (JMP target) varies by program.
             # Snowflake entry point: 0o100 (64 decimal) - verified from snowflake.rim
             print("[HEX] Step 8: Converting to RIM...")
-            DIO_OPCODE = 26   # octal 32
-            JMP_OPCODE = 48   # octal 60
-
             # HEX file is a full memory dump starting at address 0
             # Entry point for snowflake is 0o100 (verified from original RIM file)
-            DATA_START_ADDR = 0       # HEX line N goes to address N
             ENTRY_POINT = 0o100       # Snowflake entry point (64 decimal)
-
-            rim_data = bytearray()
-            addr = DATA_START_ADDR
-            word_count = 0
-
-            for line in hex_lines:
-                line = line.strip()
-                if not line or line.startswith('#'):
-                    continue
-                try:
-                    data = int(line, 16) & 0x3FFFF
-                except ValueError:
-                    continue
-                # SKIP ZERO VALUES - original RIM only sends non-zero words!
-                # This reduces 24KB -> ~2.5KB (matches original snowflake.rim)
-                if data == 0:
-                    addr = (addr + 1) & 0xFFF
-                    continue
-                rim_data.extend(bytes([
-                    0x80 | DIO_OPCODE,
-                    0x80 | ((addr >> 6) & 0x3F),
-                    0x80 | (addr & 0x3F),
-                    0x80 | ((data >> 12) & 0x3F),
-                    0x80 | ((data >> 6) & 0x3F),
-                    0x80 | (data & 0x3F)
-                ]))
-                addr = (addr + 1) & 0xFFF
-                word_count += 1
-
-            # Add JMP to entry point (0o100 = 64 decimal for snowflake)
-            rim_data.extend(bytes([
-                0x80 | JMP_OPCODE,
-                0x80 | ((ENTRY_POINT >> 6) & 0x3F),
-                0x80 | (ENTRY_POINT & 0x3F),
-                0x80, 0x80, 0x80
-            ]))
+            rim_data, word_count = hex_to_rim(hex_lines, ENTRY_POINT,
+                                              skip_blank=True)
 
             print("[HEX] {} words -> {} bytes".format(word_count, len(rim_data)))
             print("[HEX] Data loaded to addresses 0-{} (0o0-0o{:o})".format(
@@ -1844,7 +2233,7 @@ class OsdController:
 # OSD Quick Start - C64 style
 # =============================================================================
 
-def start_osd(mount_sd=True):
+def start_osd(mount_sd=True, fast_spi=False):
     """Initialize and start OSD controller with IRQ support - FIXED 2026-02-14
 
     Usage:
@@ -1854,14 +2243,18 @@ def start_osd(mount_sd=True):
 
     Args:
         mount_sd: If True, mount SD card first (default)
+        fast_spi: If True, run commands, OSD and file data at spi_freq_fast
+                  instead of spi_freq. Unverified - only for boards where
+                  it is known to work.
 
     IMPORTANT: GPIO 4 (MOSI) and GPIO 12 (MISO) are shared between SD card
     and SPI. SD card must be unmounted and pins released before SPI works!
 
     FIXED 2026-02-14: Koristi mount_sd_with_retry za robustnost!
     """
+    global spi_freq_cmd
     cwd_start = "/sd"
-    direntries_cache = []
+    names, isdir, sizes = [], bytearray(), array('I')
 
     # Step 1: Mount SD card with retry logic
     if mount_sd:
@@ -1872,20 +2265,8 @@ def start_osd(mount_sd=True):
 
     # Step 2: Read directory listing into memory while SD is accessible
     try:
-        ls = sorted(os.listdir(cwd_start))
-        for fname in ls:
-            try:
-                fullpath = cwd_start + "/" + fname
-                stat = os.stat(fullpath)
-                if stat[0] & 0o170000 == 0o040000:
-                    direntries_cache.append([fname, 1, 0])  # directory
-                else:
-                    if fname.endswith('.rim') or fname.endswith('.bin') or fname.endswith('.bit') or fname.endswith('.hex'):
-                        direntries_cache.append([fname, 0, stat[6]])  # file
-            except:
-                pass
-            gc.collect()  # GC after each file like Emard!
-        print("Cached {} entries".format(len(direntries_cache)))
+        names, isdir, sizes = _scan_dir(cwd_start)
+        print("Cached {} entries".format(len(names)))
     except Exception as e:
         print("read_dir error: {}".format(e))
 
@@ -1900,11 +2281,14 @@ def start_osd(mount_sd=True):
         pass
     release_sd_pins()
 
-    # Step 4: Initialize OSD controller (will init SPI)
-    osd = OsdController()
+    # Step 4: SPI clock (spi_freq unless opted in), then initialize
+    # OSD controller (will init SPI at that clock)
+    spi_freq_cmd = spi_freq_fast if fast_spi else spi_freq
+    print("SPI clock: {} Hz".format(spi_freq_cmd))
+    osd = OsdController(*init_spi(spi_freq_cmd))
     osd.init_fb()  # Initialize file browser
     osd.cwd = cwd_start
-    osd.direntries = direntries_cache  # Use cached directory
+    osd._set_dir(names, isdir, sizes)  # Use cached directory
 
     # FORCE OSD OFF at startup - ignores SW1 position
     osd._osd_enable_hw(0)  # Disable OSD hardware
@@ -1914,7 +2298,7 @@ def start_osd(mount_sd=True):
     osd.setup_irq()
 
     # Handle any pending IRQ
-    osd._irq_handler(0)
+    osd._irq_service(0)
 
     print("=" * 40)
     print("OSD Ready")
@@ -1949,15 +2333,15 @@ def run():
     print("Combo: UP+DOWN+LEFT+RIGHT (0x78) to toggle OSD")
     print("Press Ctrl+C to exit")
 
+    # IRQ line as a plain input: the edge IRQ is what proved unreliable,
+    # the level is only used to cut the poll wait short
+    irq_value = Pin(gpio_irq, Pin.IN, Pin.PULL_DOWN).value
     last_btn = 0
 
     try:
         while True:
             # Direktno citaj buttone preko SPI (kao debug_buttons)
-            osd._cs_active()
-            osd.spi.write_readinto(spi_read_btn, spi_result)
-            osd._cs_inactive()
-            btn = spi_result[6]
+            btn = osd.read_buttons()
 
             # Procesira samo kad se promijeni
             if btn != last_btn and btn > 1:
@@ -1970,7 +2354,12 @@ def run():
                     osd.enable[0] &= 1
 
             last_btn = btn
-            time.sleep_ms(50)
+            # Poll at least every 50 ms, immediately once FPGA raises IRQ
+            # (active-high; read_buttons() clears it)
+            for _ in range(50):
+                if irq_value():
+                    break
+                time.sleep_ms(1)
 
     except KeyboardInterrupt:
         print("\nExited by user")
@@ -2015,58 +2404,71 @@ def debug_buttons(duration_sec=30):
     release_sd_pins()
     spi, cs = init_spi()
 
-    # Button reading buffers (like C64 osd.py)
-    spi_read_btn = bytearray([1, 0xFB, 0, 0, 0, 0, 0])
-    spi_read_irq = bytearray([1, 0xF1, 0, 0, 0, 0, 0])
-    spi_result = bytearray(7)
+    # IRQ + button read in one CS window, same as OsdController's IRQ
+    # path (module buffers spi_read_irq_btn / spi_result_irq_btn)
+    res = spi_result_irq_btn
+
+    # Names for every BTN[6:1] combination, built once per session:
+    # btn_names[(btn >> 1) & 0x3F] = "UP+LEFT" etc., "" for none
+    names = ("FIRE1", "FIRE2", "UP", "DOWN", "LEFT", "RIGHT")
+    btn_names = tuple("+".join(names[b] for b in range(6) if i >> b & 1)
+                      for i in range(64))
+
+    # FPGA IRQ (active-high, RISING) only sets a flag; the SPI read runs
+    # here. Between events the loop sits in idle() with no SPI traffic.
+    # A slow fallback poll still shows buttons if IRQ is never raised -
+    # those lines are marked "(poll)", which is itself the diagnosis.
+    pending = bytearray(1)
+
+    def on_irq(pin):
+        pending[0] = 1
+
+    irq_pin = Pin(gpio_irq, Pin.IN, Pin.PULL_DOWN)
+    irq_pin.irq(trigger=Pin.IRQ_RISING, handler=on_irq, hard=True)
 
     last_btn = 0
     start = time.ticks_ms()
+    last_read = start
 
     try:
         while time.ticks_diff(time.ticks_ms(), start) < duration_sec * 1000:
-            # FAZA 1: Read IRQ flags (Emardov pristup)
-            cs.off()
-            spi.write_readinto(spi_read_irq, spi_result)
-            cs.on()
-            irq_flags = spi_result[6]  # FIXED: Byte 6 per Emard!
+            from_irq = pending[0]
+            if not from_irq:
+                if time.ticks_diff(time.ticks_ms(), last_read) < 500:
+                    idle()
+                    continue
+            pending[0] = 0
+            last_read = time.ticks_ms()
 
-            # FAZA 2: Read button status (also clears IRQ)
+            # FAZA 1 + 2: IRQ flags, then button status (also clears IRQ)
             cs.off()
-            spi.write_readinto(spi_read_btn, spi_result)
+            spi.write_readinto(spi_read_irq_btn, res)
             cs.on()
-            btn = spi_result[6]  # FIXED: Byte 6 per Emard!
+            irq_flags = res[6]  # FIXED: Byte 6 per Emard!
+            btn = res[13]       # byte 6 of the second frame
 
             # Only print when something changes or IRQ detected
             if btn != last_btn or (irq_flags & 0x80):
-                parts = []
-                if btn & BTN_FIRE1: parts.append("FIRE1")
-                if btn & BTN_FIRE2: parts.append("FIRE2")
-                if btn & BTN_UP:    parts.append("UP")
-                if btn & BTN_DOWN:  parts.append("DOWN")
-                if btn & BTN_LEFT:  parts.append("LEFT")
-                if btn & BTN_RIGHT: parts.append("RIGHT")
-
-                if parts:
-                    msg = "+".join(parts)
+                msg = btn_names[(btn >> 1) & 0x3F]
+                if msg:
                     # Check for OSD combo (0x78 = UP+DOWN+LEFT+RIGHT)
                     if (btn & 0x78) == 0x78:
                         msg += "  <<< OSD COMBO!"
-                    print("BTN: 0x{:02X} = {}  IRQ:0x{:02X}".format(btn, msg, irq_flags))
+                    print("BTN: 0x{:02X} = {}  IRQ:0x{:02X}{}".format(
+                        btn, msg, irq_flags, "" if from_irq else "  (poll)"))
                 elif btn == 0 and last_btn != 0:
                     print("BTN: 0x00 = (released)")
 
                 last_btn = btn
 
-            time.sleep_ms(50)
-
     except KeyboardInterrupt:
         print("\nExited by user")
+    finally:
+        irq_pin.irq(handler=None)
 
     print("=" * 50)
     print("Button debug ended")
     print("=" * 50)
-    gc.collect()
 
 
 def spi_diag():
@@ -2099,7 +2501,7 @@ def spi_diag():
     print("\n2. Sending OSD_ENABLE (0x41)...")
     cs.off()
     time.sleep_ms(5)
-    spi.write(bytearray([0x41]))
+    spi.write(spi_cmd_osd_on)
     time.sleep_ms(5)
     cs.on()
     print("   Sent. Check if OSD appears on screen.")
@@ -2108,10 +2510,8 @@ def spi_diag():
 
     # Test 3: Read IRQ flags (Emardov pristup: byte 6)
     print("\n3. Reading IRQ flags (0xF1) - Emardov pristup...")
-    spi_read = bytearray([1, 0xF1, 0, 0, 0, 0, 0])
-    spi_result = bytearray(7)
     cs.off()
-    spi.write_readinto(spi_read, spi_result)
+    spi.write_readinto(spi_read_irq, spi_result)
     cs.on()
     irq_val = spi_result[6]  # FIXED: Byte 6 per Emard!
     print("   Response: {} -> IRQ flags (byte 6): 0x{:02X}".format(
@@ -2119,9 +2519,8 @@ def spi_diag():
 
     # Test 4: Read buttons (Emardov pristup: byte 6)
     print("\n4. Reading buttons (0xFB) - Emardov pristup...")
-    spi_read = bytearray([1, 0xFB, 0, 0, 0, 0, 0])
     cs.off()
-    spi.write_readinto(spi_read, spi_result)
+    spi.write_readinto(spi_read_btn, spi_result)
     cs.on()
     btn_val = spi_result[6]  # FIXED: Byte 6 per Emard!
     print("   Response: {} -> Buttons (byte 6): 0x{:02X}".format(
@@ -2131,7 +2530,7 @@ def spi_diag():
     print("\n5. Sending OSD_DISABLE (0x40)...")
     cs.off()
     time.sleep_ms(5)
-    spi.write(bytearray([0x40]))
+    spi.write(spi_cmd_osd_off)
     time.sleep_ms(5)
     cs.on()
     print("   Sent. Check if OSD disappears.")
@@ -2251,37 +2650,42 @@ def test_read_dir_safe():
     print("\n1. Starting OSD...")
     osd = start_osd(mount_sd=True)
     print("   OSD started, cwd={}".format(osd.cwd))
-    print("   Initial entries: {}".format(len(osd.direntries)))
+    print("   Initial entries: {}".format(len(osd.dir_names)))
 
     # Step 2: Show current directory
     print("\n2. Current directory listing:")
-    for i, e in enumerate(osd.direntries[:10]):
-        print("   [{:2d}] {} {}".format(i, "DIR" if e[1] else "   ", e[0]))
-    if len(osd.direntries) > 10:
-        print("   ... and {} more".format(len(osd.direntries) - 10))
+    for i in range(min(10, len(osd.dir_names))):
+        print("   [{:2d}] {} {}".format(i, "DIR" if osd.dir_isdir[i] else "   ",
+                                       osd.dir_names[i]))
+    if len(osd.dir_names) > 10:
+        print("   ... and {} more".format(len(osd.dir_names) - 10))
 
     # Step 3: Try to enter first directory
-    dirs = [e for e in osd.direntries if e[1]]
-    if dirs:
-        print("\n3. Entering first directory: {}".format(dirs[0][0]))
-        osd.fb_cursor = osd.direntries.index(dirs[0])
+    first_dir = -1
+    for i in range(len(osd.dir_names)):
+        if osd.dir_isdir[i]:
+            first_dir = i
+            break
+    if first_dir >= 0:
+        print("\n3. Entering first directory: {}".format(osd.dir_names[first_dir]))
+        osd.fb_cursor = first_dir
         osd.select_entry()  # This calls read_dir_safe()
         print("   After select_entry:")
         print("   cwd={}".format(osd.cwd))
-        print("   entries={}".format(len(osd.direntries)))
+        print("   entries={}".format(len(osd.dir_names)))
     else:
         print("\n3. No directories to enter, testing read_dir_safe() directly...")
         osd.cwd = "/sd"
-        osd.direntries = []
+        osd._clear_dir()
         osd.read_dir_safe()
-        print("   entries={}".format(len(osd.direntries)))
+        print("   entries={}".format(len(osd.dir_names)))
 
     # Step 4: Try updir
     print("\n4. Testing updir()...")
     osd.updir()
     print("   After updir:")
     print("   cwd={}".format(osd.cwd))
-    print("   entries={}".format(len(osd.direntries)))
+    print("   entries={}".format(len(osd.dir_names)))
 
     print("\n" + "=" * 50)
     print("TEST COMPLETE")
@@ -90,25 +90,25 @@ try:
 
     # Enable OSD and show menu
     osd.osd_enable(True)
-    osd.osd_clear()
-
-    # Display game selection menu
-    osd.osd_write_line(0, "=== PDP-1 GAME SELECT ===")
-    osd.osd_write_line(1, "")
-    osd.osd_write_line(2, "BTN1 (FIRE1): PONG")
-    osd.osd_write_line(3, "  Default ROM - restart CPU")
-    osd.osd_write_line(4, "")
-    osd.osd_write_line(5, "BTN2 (FIRE2): Minskytron")
-    osd.osd_write_line(6, "  Classic PDP-1 demo")
-    osd.osd_write_line(7, "")
-    osd.osd_write_line(8, "BTN3 (UP): Snowflake")
-    osd.osd_write_line(9, "  Snowflake demo")
-    osd.osd_write_line(10, "")
-    osd.osd_write_line(11, "BTN4 (DOWN): Snowflake Pure")
-    osd.osd_write_line(12, "  Pure variant")
-    osd.osd_write_line(13, "")
-    osd.osd_write_line(14, "Press button to select...")
-    osd.osd_write_line(15, "")
+
+    # Display game selection menu (all 16 lines in one SPI transaction)
+    osd.osd_write_lines([
+        "=== PDP-1 GAME SELECT ===",
+        "",
+        "BTN1 (FIRE1): PONG",
+        "  Default ROM - restart CPU",
+        "",
+        "BTN2 (FIRE2): Minskytron",
+        "  Classic PDP-1 demo",
+        "",
+        "BTN3 (UP): Snowflake",
+        "  Snowflake demo",
+        "",
+        "BTN4 (DOWN): Snowflake Pure",
+        "  Pure variant",
+        "",
+        "Press button to select...",
+    ])
 
     print("\nOSD Menu displayed. Waiting for button press...")
     print("BTN1=PONG, BTN2=Minskytron, BTN3=Snowflake, BTN4=Snowflake Pure")
@@ -156,19 +156,13 @@ try:
     btn_mask, name, path, desc = selected_game
 
     # Update OSD to show selection
-    osd.osd_clear()
-    osd.osd_write_line(0, "=== LOADING ===")
-    osd.osd_write_line(2, "Game: " + name)
-    osd.osd_write_line(4, desc)
+    osd.osd_write_lines(["=== LOADING ===", "", "Game: " + name, "", desc])
 
     if path is None:
         # PONG - just restart CPU
         osd.osd_write_line(6, "Restarting CPU...")
         print("\nPONG selected - restarting CPU only")
-        loader.cpu_halt()
-        time.sleep_ms(100)
-        loader.cpu_reset()
-        time.sleep_ms(100)
+        loader.cpu_halt_reset()
         loader.cpu_run()
         osd.osd_write_line(8, "CPU running!")
     else:
@@ -0,0 +1,17 @@
+# manifest.py - freeze ld_pdp1 into a custom MicroPython ESP32 firmware
+#
+# Build (in a MicroPython source tree, ports/esp32):
+#   make BOARD=ESP32_GENERIC FROZEN_MANIFEST=/path/to/fpg1/esp32/manifest.py
+#
+# Frozen modules are imported as precompiled bytecode straight from flash:
+# no parse/compile at boot, no RAM for the compiled code, and ld_pdp1 is
+# importable before the SD card is mounted. const() values are inlined and
+# the @micropython.native helpers are compiled for xtensawin at build time.
+#
+# NOTE: sys.path has '' before '.frozen' - delete /ld_pdp1.py from the board
+# filesystem after flashing, otherwise the .py copy is imported instead.
+# main.py and wifiman.py stay on the filesystem (boot script / user config).
+
+include("$(PORT_DIR)/boards/manifest.py")
+
+module("ld_pdp1.py", opt=3)